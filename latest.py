@@ -6,18 +6,147 @@ import rasterio
 from rasterio.windows import Window
 from rasterio.transform import Affine
 from rasterio.crs import CRS
+from rasterio.enums import Resampling
 import numpy as np
+from pyproj import Transformer
+from scipy.ndimage import correlate1d
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
 import matplotlib.patheffects as PathEffects
-import urllib.request
 import json
 import datetime
-import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import functools
+from contextlib import contextmanager, suppress
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+import math
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy stencil below is used instead
+    njit = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json also parses raw bytes
+    json_loads = json.loads
+
+
+# Silent unless the embedding application configures logging
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+WGS84 = CRS.from_epsg(4326)
+
+# Longest raster side, in pixels, that is read and processed at full resolution
+MAX_DISPLAY_DIM = 4096
+
+
+def _user_cache_dir(app_name):
+    """Per-user cache directory following each platform's convention."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, app_name)
+
+
+# NASA POWER results persisted across sessions, one small JSON file per location
+POWER_CACHE_DIR = os.path.join(_user_cache_dir("Solsense"), "nasa")
+POWER_CACHE_TTL_S = 30 * 86400
+
+# Side length of the full-resolution DEM blocks cached for marker queries
+DEM_BLOCK_SIZE = 16
+
+# Most panels laid out in one run; bounds the grid and vertex arrays on very large plots
+MAX_PANELS = 1_000_000
+
+DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+# Upper edges of the N..NW sectors; digitize bucket 8 (>= 337.5) wraps back to N
+_ASPECT_BINS = np.array([22.5, 67.5, 112.5, 157.5, 202.5, 247.5, 292.5, 337.5])
+# Direction index values beyond the compass: flat cells and NoData
+FLAT_IDX, NODATA_IDX = 8, 255
+# Label for every uint8 direction index, so whole index arrays map in one lookup
+_DIRECTION_LABELS = np.array(list(DIRECTIONS) + ["Flat"] + ["N/A"] * (NODATA_IDX - FLAT_IDX))
+
+
+def _to_pos_float(text):
+    """Parses entry text as a positive finite float, or returns None."""
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if 0 < value < math.inf else None
+
+
+def _direction_label(i):
+    """Compass label for a direction index from _aspect_direction_index."""
+    return str(_DIRECTION_LABELS[i])
+
+# Tint lookup tables indexed by the uint8 gray level
+_GRAY_LEVELS = np.arange(256, dtype=np.float64)
+_LUT_LESS = np.clip(_GRAY_LEVELS * 0.3, 0, 255).astype(np.uint8)             # Less red/blue
+_LUT_GREEN_G = np.clip(_GRAY_LEVELS * 0.7 + 100, 0, 255).astype(np.uint8)    # More green (optimal)
+_LUT_MORE_R = np.clip(_GRAY_LEVELS * 0.9 + 100, 0, 255).astype(np.uint8)     # More red (suboptimal)
+_LUT_MORE_G = np.clip(_GRAY_LEVELS * 0.8 + 100, 0, 255).astype(np.uint8)     # More green (suboptimal)
+
+
+if njit is not None:
+    # nnan/ninf are left out of fastmath so NoData (NaN) cells still propagate
+    @njit(parallel=True, fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}, cache=True)
+    def _horn_kernel(dem, px, py, slope_out, aspect_out):
+        """Fused Horn slope/aspect pass with edge replication at the border."""
+        rows, cols = dem.shape
+        for i in prange(rows):
+            im = i - 1 if i > 0 else 0
+            ip = i + 1 if i < rows - 1 else rows - 1
+            for j in range(cols):
+                jm = j - 1 if j > 0 else 0
+                jp = j + 1 if j < cols - 1 else cols - 1
+
+                a00 = dem[im, jm]
+                a01 = dem[im, j]
+                a02 = dem[im, jp]
+                a10 = dem[i, jm]
+                a12 = dem[i, jp]
+                a20 = dem[ip, jm]
+                a21 = dem[ip, j]
+                a22 = dem[ip, jp]
+
+                dzdx = ((a02 + 2 * a12 + a22) - (a00 + 2 * a10 + a20)) / (8.0 * px)
+                dzdy = ((a20 + 2 * a21 + a22) - (a00 + 2 * a01 + a02)) / (8.0 * py)
+
+                slope = math.degrees(math.atan(math.sqrt(dzdx * dzdx + dzdy * dzdy)))
+                aspect = math.degrees(math.atan2(dzdx, dzdy))
+                if aspect < 0:
+                    aspect += 360.0
+                if slope < 1e-6:
+                    aspect = -1.0
+                if math.isnan(dem[i, j]):
+                    slope = math.nan
+                    aspect = math.nan
+
+                slope_out[i, j] = slope
+                aspect_out[i, j] = aspect
+
+    # Compile once at import so the first GeoTIFF load doesn't pay for it
+    _warm = np.zeros((3, 3), dtype=np.float32)
+    _horn_kernel(_warm, 1.0, 1.0, np.empty_like(_warm), np.empty_like(_warm))
+    del _warm
+else:
+    _horn_kernel = None
 
 
 class GeoTIFFSlopeViewer:
@@ -47,17 +176,42 @@ class GeoTIFFSlopeViewer:
         self.dataset = None
         self.slope_degrees = None
         self.aspect_degrees = None
+        self.aspect_dir_idx = None
         self.original_crs = None
         self.transform = None
+        self._pixel_center_transform = None
+        self._to_wgs84 = None
         self.display_image_rgba = None
+        self._img_artist = None
+        self._colorbar = None
+        self._no_data_text = None
         self.nodata_value = None
         self.marker_pixel_coords = None
         self.marker_lon_lat = None
+        self._marker_raster_sample = None
         self.marker_object = None
         self.land_area_rect_patch = None
-        self.packed_object_patches = []
+        self._panel_collection = None
+        self._bg = None
+        self._draw_depth = 0
+        self._dirty = False
+        self._sr_pending = False
         self.pixel_width_m = 1.0
         self.pixel_height_m = 1.0
+        self.display_scale = 1
+        # Exact full-resolution pixels per display pixel along x/y, and the full-resolution size in meters
+        self._display_step = (1.0, 1.0)
+        self._full_res_pixel_m = (1.0, 1.0)
+        # Pooled keep-alive connections: repeat misses skip the TCP/TLS handshake
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8,
+                                                 max_retries=Retry(total=3, backoff_factor=0.3)))
+        self._pool = ThreadPoolExecutor(max_workers=4)
+        self._energy_request_id = 0
+        # One pre-formatted row per completed analysis, written out by export_results_csv
+        self._export_rows = []
+        # Last text written to each status label, compared without a Tcl cget round trip
+        self._label_text = {}
 
         # Configure modern styles
         self.setup_styles()
@@ -175,10 +329,7 @@ class GeoTIFFSlopeViewer:
         scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.controls_canvas.yview)
         self.scrollable_frame = tk.Frame(self.controls_canvas, bg=self.colors['background'])
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.controls_canvas.configure(scrollregion=self.controls_canvas.bbox("all"))
-        )
+        self.scrollable_frame.bind("<Configure>", self._update_scrollregion)
 
         self.controls_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
         self.controls_canvas.configure(yscrollcommand=scrollbar.set)
@@ -195,6 +346,16 @@ class GeoTIFFSlopeViewer:
         # Analysis results section
         self.create_results_section()
 
+    def _update_scrollregion(self, event=None):
+        # Layout fires <Configure> in bursts; recompute the bbox once when idle
+        if not self._sr_pending:
+            self._sr_pending = True
+            self.master.after_idle(self._do_update_scrollregion)
+
+    def _do_update_scrollregion(self):
+        self._sr_pending = False
+        self.controls_canvas.configure(scrollregion=self.controls_canvas.bbox("all"))
+
     def create_file_section(self):
         """Create the file loading section"""
         file_frame = ttk.Labelframe(self.scrollable_frame,
@@ -468,6 +629,8 @@ class GeoTIFFSlopeViewer:
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=map_container)
         self.canvas_widget = self.canvas.get_tk_widget()
+        # Without blitting, overlays are ordinary artists redrawn with the full canvas
+        self._use_blit = getattr(self.canvas, 'supports_blit', False)
         self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
 
         # Toolbar
@@ -480,6 +643,8 @@ class GeoTIFFSlopeViewer:
 
         # Connect click event
         self.fig.canvas.mpl_connect('button_press_event', self.on_click_map)
+        # Every full redraw (load, resize, pan/zoom) refreshes the blit background
+        self.fig.canvas.mpl_connect('draw_event', self._on_canvas_draw)
 
     def create_status_bar(self):
         """Create the status bar at the bottom"""
@@ -495,25 +660,32 @@ class GeoTIFFSlopeViewer:
         self.lbl_coords.pack(expand=True, fill=tk.BOTH, padx=20, pady=8)
 
     def _calculate_slope_aspect_horn(self, dem, pixel_width, pixel_height):
-        padded_dem = np.pad(dem, pad_width=1, mode='edge')
-
-        dz_dx = (
-            (padded_dem[0:-2, 2:] + 2 * padded_dem[1:-1, 2:] + padded_dem[2:, 2:]) -
-            (padded_dem[0:-2, 0:-2] + 2 * padded_dem[1:-1, 0:-2] + padded_dem[2:, 0:-2])
-        ) / (8 * 30)
-
-        dz_dy = (
-            (padded_dem[2:, 0:-2] + 2 * padded_dem[2:, 1:-1] + padded_dem[2:, 2:]) -
-            (padded_dem[0:-2, 0:-2] + 2 * padded_dem[0:-2, 1:-1] + padded_dem[0:-2, 2:])
-        ) / (8 * 30)
-
-        slope_rad = np.arctan(np.sqrt(dz_dx**2 + dz_dy**2))
-        slope_deg = np.degrees(slope_rad)
+        dem = np.ascontiguousarray(dem, dtype=np.float32)
+        if _horn_kernel is not None:
+            slope_deg = np.empty(dem.shape, dtype=np.float32)
+            aspect_deg = np.empty(dem.shape, dtype=np.float32)
+            _horn_kernel(dem, float(pixel_width), float(pixel_height), slope_deg, aspect_deg)
+            return slope_deg, aspect_deg
+
+        # The Horn kernel is separable: a [1, 2, 1] smoothing pass across the
+        # gradient direction followed by a [-1, 0, 1] difference along it.
+        # mode='nearest' gives the same edge replication as padding.
+        # Everything stays float32 and reuses buffers via out=/output=.
+        smoothed = correlate1d(dem, [1, 2, 1], axis=0, mode='nearest')
+        dz_dx = correlate1d(smoothed, [-1, 0, 1], axis=1, mode='nearest')
+        dz_dx *= np.float32(1.0 / (8.0 * pixel_width))
+        correlate1d(dem, [1, 2, 1], axis=1, output=smoothed, mode='nearest')
+        dz_dy = correlate1d(smoothed, [-1, 0, 1], axis=0, mode='nearest')
+        dz_dy *= np.float32(1.0 / (8.0 * pixel_height))
+
+        slope_deg = np.hypot(dz_dx, dz_dy, out=smoothed)
+        np.arctan(slope_deg, out=slope_deg)
+        np.degrees(slope_deg, out=slope_deg)
 
         # Calculate aspect
         # We use atan2(dz_dx, dz_dy) for a convention where 0 is North.
-        aspect_rad = np.arctan2(dz_dx, dz_dy)
-        aspect_deg = np.degrees(aspect_rad)
+        aspect_deg = np.arctan2(dz_dx, dz_dy, out=dz_dx)
+        np.degrees(aspect_deg, out=aspect_deg)
 
         aspect_deg[aspect_deg < 0] += 360
 
@@ -525,6 +697,35 @@ class GeoTIFFSlopeViewer:
 
         return slope_deg, aspect_deg
 
+    def _pixel_size_m(self, src):
+        """Returns the pixel size in meters, converting degrees for geographic CRSs."""
+        pixel_width = abs(src.transform.a)
+        pixel_height = abs(src.transform.e)
+        if src.crs and src.crs.is_geographic:
+            center_lat = src.transform.f + src.transform.e * src.height / 2.0
+            pixel_width *= 111320.0 * math.cos(math.radians(center_lat))
+            pixel_height *= 110540.0
+        return pixel_width, pixel_height
+
+    def _display_scale(self, src):
+        """Integer decimation factor that keeps the DEM within MAX_DISPLAY_DIM pixels."""
+        return max(1, -(-max(src.width, src.height) // MAX_DISPLAY_DIM))
+
+    def _display_shape(self, src):
+        """(rows, cols) the DEM is read at after decimation."""
+        scale = self._display_scale(src)
+        return max(1, src.height // scale), max(1, src.width // scale)
+
+    # Only the current file: its arrays are the ones on display, so the cache costs no extra memory
+    @functools.lru_cache(maxsize=1)
+    def _cached_slope_aspect(self, filepath, mtime, pixel_width, pixel_height):
+        """Derives slope/aspect from the open self.dataset; filepath and mtime only key the cache."""
+        src = self.dataset
+        dem_data = src.read(1, out_shape=self._display_shape(src),
+                            resampling=Resampling.average, masked=True, out_dtype=np.float32)
+        dem_data = dem_data.filled(np.nan)
+        return self._calculate_slope_aspect_horn(dem_data, pixel_width, pixel_height)
+
     def load_geotiff(self):
         self.filepath = filedialog.askopenfilename(
             title="Select GeoTIFF File",
@@ -534,95 +735,178 @@ class GeoTIFFSlopeViewer:
             return
 
         try:
-            with rasterio.open(self.filepath) as src:
-                self.original_crs = src.crs
-                self.transform = src.transform
-                dem_data = src.read(1).astype(np.float32)
-                self.nodata_value = src.nodata
-
-                if self.nodata_value is not None:
-                    dem_data[dem_data == self.nodata_value] = np.nan
-                if not self.original_crs:
-                    messagebox.showwarning("CRS Warning", "GeoTIFF does not have a CRS defined.")
-                if not self.transform:
-                    messagebox.showerror("Transform Error", "GeoTIFF does not have a geotransform.")
-                    return
-                self.pixel_width_m = abs(self.transform.a)
-                self.pixel_height_m = abs(self.transform.e)
-
-            # --- Calculate slope and aspect 
-            self.slope_degrees, self.aspect_degrees = self._calculate_slope_aspect_horn(
-                dem_data, self.pixel_width_m, self.pixel_height_m
+            # Kept open for the session so marker queries can read full-resolution windows
+            self._close_dataset()
+            src = self.dataset = rasterio.open(self.filepath)
+            self._read_dem_block.cache_clear()
+            self.original_crs = src.crs
+            self.transform = src.transform
+            self.nodata_value = src.nodata
+
+            if not self.original_crs:
+                messagebox.showwarning("CRS Warning", "GeoTIFF does not have a CRS defined.")
+            if not self.transform:
+                messagebox.showerror("Transform Error", "GeoTIFF does not have a geotransform.")
+                return
+            self._full_res_pixel_m = self._pixel_size_m(src)
+
+            # Large rasters are read decimated; GDAL uses overviews when present
+            self.display_scale = self._display_scale(src)
+            # out_shape floors each side, so the true step is width/out_w rather than display_scale
+            out_h, out_w = self._display_shape(src)
+            self._display_step = (src.width / out_w, src.height / out_h)
+            self.transform = src.transform * Affine.scale(*self._display_step)
+            # Cached so a click maps pixel -> CRS with one affine multiply
+            self._pixel_center_transform = self.transform * Affine.translation(0.5, 0.5)
+            self.pixel_width_m = self._full_res_pixel_m[0] * self._display_step[0]
+            self.pixel_height_m = self._full_res_pixel_m[1] * self._display_step[1]
+
+            # Built once per file; clicks reuse the same PROJ coordinate operation
+            self._to_wgs84 = None
+            if self.original_crs and not self.original_crs.is_geographic:
+                self._to_wgs84 = Transformer.from_crs(self.original_crs, WGS84, always_xy=True)
+
+            # --- Calculate slope and aspect (reused while the file is unchanged)
+            self.slope_degrees, self.aspect_degrees = self._cached_slope_aspect(
+                self.filepath, os.path.getmtime(self.filepath),
+                self.pixel_width_m, self.pixel_height_m
             )
+            # Reused by every display_slope refresh; alpha only depends on NoData
+            self.display_image_rgba = np.empty(self.slope_degrees.shape + (4,), dtype=np.uint8)
+            self.display_image_rgba[..., 3] = np.where(np.isnan(self.slope_degrees), 0, 255)
+            self.aspect_dir_idx = self._aspect_direction_index(self.aspect_degrees)
 
-            self.lbl_file.config(text=self.filepath.split('/')[-1])
-            self.display_slope()
+            self._set_label(self.lbl_file, self.filepath.split('/')[-1])
             self.clear_marker_and_packing()
+            self.display_slope()
 
         except Exception as e:
             messagebox.showerror("Error Loading GeoTIFF", f"An error occurred: {e}")
             self.filepath = None
-            self.dataset = None
+            self._close_dataset()
             self.slope_degrees = None
             self.aspect_degrees = None
+            self.aspect_dir_idx = None
             self.original_crs = None
             self.transform = None
-            self.ax.clear()
-            self.canvas.draw()
-            self.lbl_file.config(text="No file loaded.")
+            self._pixel_center_transform = None
+            self._to_wgs84 = None
             self.clear_marker_and_packing()
+            self._reset_map()
+            self.canvas.draw()
+            self._set_label(self.lbl_file, "No file loaded.")
 
-        self.lbl_file.config(text="📁 TIFF file loaded successfully",
+        self._set_label(self.lbl_file, "📁 TIFF file loaded successfully",
             fg=self.colors['success'])
         pass
 
+    def _close_dataset(self):
+        if self.dataset is not None:
+            self.dataset.close()
+            self.dataset = None
+
+    @functools.lru_cache(maxsize=4096)
+    def _read_dem_block(self, block_row, block_col):
+        """Full-resolution DEM block plus a 1-pixel halo, clipped to the raster."""
+        row_off = max(block_row * DEM_BLOCK_SIZE - 1, 0)
+        col_off = max(block_col * DEM_BLOCK_SIZE - 1, 0)
+        height = min((block_row + 1) * DEM_BLOCK_SIZE + 1, self.dataset.height) - row_off
+        width = min((block_col + 1) * DEM_BLOCK_SIZE + 1, self.dataset.width) - col_off
+        block = self.dataset.read(1, window=Window(col_off, row_off, width, height),
+                                  masked=True, out_dtype=np.float32)
+        return block.filled(np.nan), row_off, col_off
+
+    def _sample_slope_aspect(self, row, col):
+        """Slope, aspect and direction at a display pixel, from the full-resolution DEM when decimated."""
+        if self.display_scale == 1:
+            direction = _direction_label(self.aspect_dir_idx[row, col])
+            return self.slope_degrees[row, col], self.aspect_degrees[row, col], direction
+
+        # Full-resolution pixel under the center of the decimated one
+        step_x, step_y = self._display_step
+        full_row = min(int((row + 0.5) * step_y), self.dataset.height - 1)
+        full_col = min(int((col + 0.5) * step_x), self.dataset.width - 1)
+        block, row_off, col_off = self._read_dem_block(full_row // DEM_BLOCK_SIZE,
+                                                       full_col // DEM_BLOCK_SIZE)
+        r, c = full_row - row_off, full_col - col_off
+        # Clamping only bites at the raster edge, matching the stencil's edge replication
+        rows = np.clip([r - 1, r, r + 1], 0, block.shape[0] - 1)
+        cols = np.clip([c - 1, c, c + 1], 0, block.shape[1] - 1)
+        slope, aspect = self._calculate_slope_aspect_horn(
+            block[np.ix_(rows, cols)], *self._full_res_pixel_m
+        )
+        return slope[1, 1], aspect[1, 1], self._get_aspect_direction(aspect[1, 1])
+
     def display_slope(self):
         if self.slope_degrees is None:
             return
-        self.ax.clear()
-        slope_display = np.copy(self.slope_degrees)
-        if self.nodata_value is not None:
-            slope_display[np.isnan(self.slope_degrees)] = -9999
-        valid_slope = slope_display[slope_display != -9999]
-        if valid_slope.size == 0:
-            self.ax.text(0.5, 0.5, "No valid slope data to display.", ha='center', va='center')
+        self._bg = None
+        # Checked first: nanmin/nanmax warn on an all-NaN grid
+        if not np.isfinite(self.slope_degrees).any():
+            self._reset_map()
+            self._no_data_text = self.ax.text(0.5, 0.5, "No valid slope data to display.",
+                                              ha='center', va='center')
             self.canvas.draw()
             return
-        normalized_slope = (slope_display - np.nanmin(valid_slope)) / (np.nanmax(valid_slope) - np.nanmin(valid_slope))
-        normalized_slope = np.nan_to_num(normalized_slope, nan=0)
-        img_gray = (normalized_slope * 255).astype(np.uint8)
-        self.display_image_rgba = np.zeros((self.slope_degrees.shape[0], self.slope_degrees.shape[1], 4), dtype=np.uint8)
-        self.display_image_rgba[..., 0:3] = img_gray[..., np.newaxis]
-        self.display_image_rgba[..., 3] = 255
-        low_slope_mask = (self.slope_degrees < 5) & (~np.isnan(self.slope_degrees))
+        vmin = np.nanmin(self.slope_degrees)
+        vmax = np.nanmax(self.slope_degrees)
+        normalized_slope = np.subtract(self.slope_degrees, vmin)
+        np.divide(normalized_slope, (vmax - vmin) or 1.0, out=normalized_slope)
+        np.nan_to_num(normalized_slope, copy=False, nan=0)
+        normalized_slope *= 255
+        img_gray = normalized_slope.astype(np.uint8)
+        # NaN compares False, so NoData cells drop out of both masks
+        low_slope_mask = self.slope_degrees < 5
 
         # Create masks for south-facing slopes (SE, S, SW: 112.5° to 247.5°)
-        south_facing_mask = (
-            (self.aspect_degrees >= 112.5) & (self.aspect_degrees <= 247.5) & 
-            (~np.isnan(self.aspect_degrees))
-        )
+        south_facing_mask = (self.aspect_degrees >= 112.5) & (self.aspect_degrees <= 247.5)
 
-        # Green tint for low slope AND south-facing areas
+        # Green tint for low slope AND south-facing areas, yellow for low slope otherwise
         optimal_mask = low_slope_mask & south_facing_mask
-        self.display_image_rgba[optimal_mask, 0] = np.clip(img_gray[optimal_mask] * 0.3, 0, 255)      # Less red
-        self.display_image_rgba[optimal_mask, 1] = np.clip(img_gray[optimal_mask] * 0.7 + 100, 0, 255)  # More green
-        self.display_image_rgba[optimal_mask, 2] = np.clip(img_gray[optimal_mask] * 0.3, 0, 255)      # Less blue
-
-        # Yellow tint for low slope but NOT south-facing areas
-        suboptimal_mask = low_slope_mask & (~south_facing_mask)
-        self.display_image_rgba[suboptimal_mask, 0] = np.clip(img_gray[suboptimal_mask] * 0.9 + 100, 0, 255)  # More red
-        self.display_image_rgba[suboptimal_mask, 1] = np.clip(img_gray[suboptimal_mask] * 0.8 + 100, 0, 255)  # More green
-        self.display_image_rgba[suboptimal_mask, 2] = np.clip(img_gray[suboptimal_mask] * 0.3, 0, 255)       # Less blue
-        nan_mask = np.isnan(self.slope_degrees)
-        self.display_image_rgba[nan_mask, 3] = 0
-        self.ax.imshow(self.display_image_rgba)
+        suboptimal_mask = low_slope_mask & ~south_facing_mask
+        tint_masks = [optimal_mask, suboptimal_mask]
+
+        rgba = self.display_image_rgba
+        rgba[..., 0] = np.select(tint_masks, [_LUT_LESS[img_gray], _LUT_MORE_R[img_gray]], img_gray)
+        rgba[..., 1] = np.select(tint_masks, [_LUT_GREEN_G[img_gray], _LUT_MORE_G[img_gray]], img_gray)
+        rgba[..., 2] = np.where(low_slope_mask, _LUT_LESS[img_gray], img_gray)
+
+        # The image, colorbar and legend are built once and updated in place afterwards
+        if self._img_artist is None:
+            self._create_slope_artists(vmin, vmax)
+        else:
+            self._img_artist.set_data(self.display_image_rgba)
+            self._colorbar.mappable.set_clim(vmin, vmax)
+
+        rows, cols = self.slope_degrees.shape
+        self._img_artist.set_extent((-0.5, cols - 0.5, rows - 0.5, -0.5))
+        self.ax.set_xlim(-0.5, cols - 0.5)
+        self.ax.set_ylim(rows - 0.5, -0.5)
+        self.canvas.draw()
+
+    def _reset_map(self):
+        """Clears the axes and forgets the cached image, colorbar, message and panel artists."""
+        if self._colorbar is not None:
+            self._colorbar.remove()
+            self._colorbar = None
+        self._img_artist = None
+        self._panel_collection = None
+        self._no_data_text = None
+        self.ax.clear()
+        self._bg = None
+
+    def _create_slope_artists(self, vmin, vmax):
+        # Left behind by an earlier all-NoData raster
+        if self._no_data_text is not None:
+            self._no_data_text.remove()
+            self._no_data_text = None
+        self._img_artist = self.ax.imshow(self.display_image_rgba)
 
         # Add colorbar
-        sm = plt.cm.ScalarMappable(cmap='gray', norm=plt.Normalize(vmin=np.nanmin(self.slope_degrees),
-                                                                   vmax=np.nanmax(self.slope_degrees)))
+        sm = plt.cm.ScalarMappable(cmap='gray', norm=plt.Normalize(vmin=vmin, vmax=vmax))
         sm.set_array([])
-        cb = self.fig.colorbar(sm, ax=self.ax, orientation='horizontal', fraction=0.04, pad=0.08)
-        cb.set_label('Slope [degrees]')
+        self._colorbar = self.fig.colorbar(sm, ax=self.ax, orientation='horizontal', fraction=0.04, pad=0.08)
+        self._colorbar.set_label('Slope [degrees]')
 
         #self.ax.set_title("Slope Map (<5° tinted Green)")
         title_y = 1.02
@@ -651,194 +935,220 @@ class GeoTIFFSlopeViewer:
 
         self.ax.set_xlabel("Pixel X")
         self.ax.set_ylabel("Pixel Y")
-        self.canvas.draw()
 
     def _get_aspect_direction(self, degrees):
-        """Converts aspect degrees to a compass direction string."""
-        if degrees < 0:
-            return "Flat"
-        if (degrees >= 337.5) or (degrees < 22.5):
-            return "N"
-        if (degrees >= 22.5) and (degrees < 67.5):
-            return "NE"
-        if (degrees >= 67.5) and (degrees < 112.5):
-            return "E"
-        if (degrees >= 112.5) and (degrees < 157.5):
-            return "SE"
-        if (degrees >= 157.5) and (degrees < 202.5):
-            return "S"
-        if (degrees >= 202.5) and (degrees < 247.5):
-            return "SW"
-        if (degrees >= 247.5) and (degrees < 292.5):
-            return "W"
-        if (degrees >= 292.5) and (degrees < 337.5):
-            return "NW"
-        return "N/A"
+        """Converts aspect degrees (scalar or array) to compass direction strings."""
+        idx = self._aspect_direction_index(np.atleast_1d(degrees))
+        if np.ndim(degrees) == 0:
+            return _direction_label(idx[0])
+        return _DIRECTION_LABELS[idx]
+
+    def _aspect_direction_index(self, degrees):
+        """uint8 compass bucket per cell: 0-7 index DIRECTIONS, plus FLAT_IDX and NODATA_IDX."""
+        degrees = np.asarray(degrees)
+        idx = (np.digitize(degrees, _ASPECT_BINS) % 8).astype(np.uint8)
+        idx[degrees < 0] = FLAT_IDX
+        idx[np.isnan(degrees)] = NODATA_IDX
+        return idx
 
     def on_click_map(self, event):
         if event.inaxes != self.ax:
             return
         if self.transform is None or self.original_crs is None or self.slope_degrees is None:
-            self.lbl_coords.config(text="Load GeoTIFF first.")
+            self._set_label(self.lbl_coords, "Load GeoTIFF first.")
             return
 
         col, row = int(round(event.xdata)), int(round(event.ydata))
 
         if not (0 <= row < self.slope_degrees.shape[0] and 0 <= col < self.slope_degrees.shape[1]):
-            self.lbl_coords.config(text="Clicked outside image bounds.")
+            self._set_label(self.lbl_coords, "Clicked outside image bounds.")
             return
 
         self.marker_pixel_coords = (col, row)
-        x_coord, y_coord = rasterio.transform.xy(self.transform, row, col, offset='center')
+        x_coord, y_coord = self._pixel_center_transform * (col, row)
 
-        current_lon, current_lat = x_coord, y_coord
         try:
-            if not self.original_crs.is_geographic:
-                lons_lats = rasterio.warp.transform(self.original_crs, {'init': 'epsg:4326'}, [x_coord], [y_coord])
-                current_lon, current_lat = lons_lats[0][0], lons_lats[1][0]
+            if self._to_wgs84 is None:
+                # Geographic CRS: map coordinates already are lon/lat, no PROJ call needed
+                current_lon, current_lat = x_coord, y_coord
+            else:
+                current_lon, current_lat = self._to_wgs84.transform(x_coord, y_coord)
 
             self.marker_lon_lat = (current_lon, current_lat)
 
-            slope_val = self.slope_degrees[row, col]
-            aspect_val = self.aspect_degrees[row, col]
+            # Sampled once per marker; export reuses it instead of touching the rasters again
+            self._marker_raster_sample = self._sample_slope_aspect(row, col)
+            slope_val, aspect_val, direction = self._marker_raster_sample
             slope_text = f"{slope_val:.2f}°" if not np.isnan(slope_val) else "NoData"
 
             if np.isnan(aspect_val):
                 aspect_text = "NoData"
             else:
-                direction = self._get_aspect_direction(aspect_val)
                 aspect_text = f"{aspect_val:.1f}° ({direction})"
 
-            self.lbl_coords.config(text=f"Lon: {current_lon:.6f}, Lat: {current_lat:.6f} (Slope: {slope_text}, Aspect: {aspect_text})")
-            self.lbl_marker_coords.config(text=f"Marker Lon/Lat: {current_lon:.6f}, {current_lat:.6f}")
-            self.draw_marker()
-            #self.clear_packing_visualization()
-            self.lbl_panels_packed.config(text="Packed: N/A")
-            self.lbl_annual_energy.config(text="Est. Annual Energy: N/A")
+            lon_text, lat_text = f"{current_lon:.6f}", f"{current_lat:.6f}"
+            self._set_label(self.lbl_coords, f"Lon: {lon_text}, Lat: {lat_text} (Slope: {slope_text}, Aspect: {aspect_text})")
+            self._set_label(self.lbl_marker_coords, f"Marker Lon/Lat: {lon_text}, {lat_text}")
+            with self._batch_draw():
+                self.draw_marker()
+                self.clear_packing_visualization()
+            self._set_label(self.lbl_panels_packed, "Packed: N/A")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: N/A")
+            self._energy_request_id += 1
 
         except Exception as e:
-            self.lbl_coords.config(text=f"Coordinate Conversion Error: {e}")
-            self.lbl_marker_coords.config(text="Marker Lon/Lat: Error")
+            self._set_label(self.lbl_coords, f"Coordinate Conversion Error: {e}")
+            self._set_label(self.lbl_marker_coords, "Marker Lon/Lat: Error")
             self.marker_lon_lat = None
+            self._marker_raster_sample = None
             self.clear_marker()
 
+    def _overlay_artists(self):
+        """Animated artists drawn on top of the cached slope map."""
+        artists = [self.marker_object] if self.marker_object else []
+        if self.land_area_rect_patch:
+            artists.append(self.land_area_rect_patch)
+        if self._panel_collection is not None and self._panel_collection.get_visible():
+            artists.append(self._panel_collection)
+        return artists
+
+    def _on_canvas_draw(self, event):
+        if not self._use_blit:
+            return
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self._overlay_artists():
+            self.ax.draw_artist(artist)
+
+    def _blit_overlays(self):
+        """Restores the cached map background and redraws only the overlays."""
+        if not self._use_blit or self._bg is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._bg)
+        for artist in self._overlay_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    @contextmanager
+    def _batch_draw(self):
+        """Coalesces the redraws requested inside the block into one at the outermost exit."""
+        self._draw_depth += 1
+        try:
+            yield
+        finally:
+            self._draw_depth -= 1
+            if self._draw_depth == 0 and self._dirty:
+                self._dirty = False
+                self._blit_overlays()
+
+    def _request_redraw(self):
+        if self._draw_depth:
+            self._dirty = True
+        else:
+            self._blit_overlays()
+
+    def _set_label(self, lbl, text, **options):
+        """Reconfigures a Tk label only when its text (or another option) actually changes."""
+        if options or self._label_text.get(lbl) != text:
+            lbl.config(text=text, **options)
+            self._label_text[lbl] = text
+
     def draw_marker(self):
         self.clear_marker()
         if self.marker_pixel_coords and self.ax:
             col, row = self.marker_pixel_coords
-            self.marker_object = self.ax.plot(col, row, 'ro', markersize=8, markeredgecolor='white',
-                                              path_effects=[PathEffects.withStroke(linewidth=2, foreground='black')])
-            self.canvas.draw_idle()
+            self.marker_object, = self.ax.plot(col, row, 'ro', markersize=8, markeredgecolor='white',
+                                               path_effects=[PathEffects.withStroke(linewidth=2, foreground='black')],
+                                               animated=self._use_blit)
+            self._request_redraw()
 
     def clear_marker(self):
         if self.marker_object:
-            try:
-                for M in self.marker_object:
-                    M.remove()
-            except TypeError:
-                self.marker_object.remove()
+            self.marker_object.remove()
             self.marker_object = None
-            self.canvas.draw_idle()
+            self._request_redraw()
 
     def clear_packing_visualization(self):
         if self.land_area_rect_patch:
             self.land_area_rect_patch.remove()
             self.land_area_rect_patch = None
-        for patch in self.packed_object_patches:
-            patch.remove()
-        self.packed_object_patches = []
+        if self._panel_collection is not None and self._panel_collection.get_visible():
+            # Hidden rather than removed so the next run can reuse the artist
+            self._panel_collection.set_visible(False)
         if self.ax:
-            self.canvas.draw_idle()
+            self._request_redraw()
 
     def clear_marker_and_packing(self):
-        self.clear_marker()
-        #self.clear_packing_visualization()
+        with self._batch_draw():
+            self.clear_marker()
+            self.clear_packing_visualization()
         self.marker_pixel_coords = None
         self.marker_lon_lat = None
-        self.lbl_marker_coords.config(text="Marker Lon/Lat: N/A")
-        self.lbl_panels_packed.config(text="Packed: N/A")
-        self.lbl_annual_energy.config(text="Est. Annual Energy: N/A")
-        self.lbl_coords.config(text="Clicked Coordinates: Lon=N/A, Lat=N/A (Slope: N/A, Aspect: N/A)")
+        self._marker_raster_sample = None
+        self._set_label(self.lbl_marker_coords, "Marker Lon/Lat: N/A")
+        self._set_label(self.lbl_panels_packed, "Packed: N/A")
+        self._set_label(self.lbl_annual_energy, "Est. Annual Energy: N/A")
+        self._energy_request_id += 1
+        self._set_label(self.lbl_coords, "Clicked Coordinates: Lon=N/A, Lat=N/A (Slope: N/A, Aspect: N/A)")
 
     def _validate_energy_inputs(self):
-        try:
-            efficiency = float(self.entry_panel_efficiency.get())
-            perf_ratio = float(self.entry_perf_ratio.get())
-            if not (0 < efficiency <= 100):
-                raise ValueError("Efficiency must be between 0 and 100%.")
-            if not (0 < perf_ratio <= 1):
-                raise ValueError("Performance Ratio must be between 0 and 1.")
-            return efficiency / 100.0, perf_ratio
-        except ValueError as e:
-            messagebox.showerror("Input Error", f"Invalid energy parameters: {e}")
+        efficiency = _to_pos_float(self.entry_panel_efficiency.get())
+        perf_ratio = _to_pos_float(self.entry_perf_ratio.get())
+        errors = []
+        if efficiency is None or efficiency > 100:
+            errors.append("Efficiency must be between 0 and 100%.")
+        if perf_ratio is None or perf_ratio > 1:
+            errors.append("Performance Ratio must be between 0 and 1.")
+        if errors:
+            messagebox.showerror("Input Error", "Invalid energy parameters:\n" + "\n".join(errors))
             return None
+        return efficiency / 100.0, perf_ratio
 
     def _validate_packing_inputs(self):
-        try:
-            land_width_m = float(self.entry_land_width.get())
-            land_height_m = float(self.entry_land_height.get())
-            obj_width_m = float(self.entry_obj_width.get())
-            obj_height_m = float(self.entry_obj_height.get())
-            num_objects_to_pack = None
-            if self.pack_mode.get() == "specify":
-                num_objects_to_pack = int(self.entry_num_objects.get())
-                if num_objects_to_pack <= 0:
-                    raise ValueError("Number of objects must be positive.")
-            if not (land_width_m > 0 and land_height_m > 0 and obj_width_m > 0 and obj_height_m > 0):
-                raise ValueError("Dimensions must be positive.")
-            return land_width_m, land_height_m, obj_width_m, obj_height_m, num_objects_to_pack
-        except ValueError as e:
-            messagebox.showerror("Input Error", f"Invalid packing input: {e}")
+        dims = [_to_pos_float(entry.get()) for entry in
+                (self.entry_land_width, self.entry_land_height, self.entry_obj_width, self.entry_obj_height)]
+        errors = []
+        if None in dims:
+            errors.append("Dimensions must be positive numbers.")
+        num_objects_to_pack = None
+        if self.pack_mode.get() == "specify":
+            num_objects_to_pack = _to_pos_float(self.entry_num_objects.get())
+            if num_objects_to_pack is None or not num_objects_to_pack.is_integer():
+                errors.append("Number of objects must be a positive whole number.")
+            else:
+                num_objects_to_pack = int(num_objects_to_pack)
+        if errors:
+            messagebox.showerror("Input Error", "Invalid packing input:\n" + "\n".join(errors))
             return None
+        return (*dims, num_objects_to_pack)
 
     def next_fit_shelf_packing(self, land_width_m, land_height_m, obj_width_m, obj_height_m, num_objects_to_pack=None):
-        packed_objects_coords = []
-        current_x_m = 0.0
-        shelf_bottom_y_m = 0.0
-        shelf_effective_height_m = obj_height_m
-        objects_placed = 0
-
+        """Returns the (xs, ys) arrays of panel offsets in meters; every panel is obj_width_m x obj_height_m."""
+        no_panels = (np.empty(0), np.empty(0))
         if obj_width_m <= 0 or obj_height_m <= 0:
-            return []
-        if obj_width_m > land_width_m or obj_height_m > land_height_m:
-            return []
-
-        max_iterations = 1_000_000
-        iter_count = 0
-
-        while iter_count < max_iterations:
-            iter_count += 1
-            if num_objects_to_pack is not None and objects_placed >= num_objects_to_pack:
-                break
-
-            if shelf_bottom_y_m + shelf_effective_height_m <= land_height_m:
-                if current_x_m + obj_width_m <= land_width_m:
-                    packed_objects_coords.append({'x': current_x_m, 'y': shelf_bottom_y_m, 'w': obj_width_m, 'h': obj_height_m})
-                    current_x_m += obj_width_m
-                    objects_placed += 1
-                    continue
-                else:
-                    current_x_m = 0.0
-                    shelf_bottom_y_m += shelf_effective_height_m
-                    if shelf_bottom_y_m + shelf_effective_height_m <= land_height_m:
-                        if current_x_m + obj_width_m <= land_width_m:
-                            packed_objects_coords.append({'x': current_x_m, 'y': shelf_bottom_y_m, 'w': obj_width_m, 'h': obj_height_m})
-                            current_x_m += obj_width_m
-                            objects_placed += 1
-                            continue
-                        else:
-                            break
-                    else:
-                        break
-            else:
-                break
-
-        if iter_count >= max_iterations:
-            print(f"Warning: Packing reached max iterations ({max_iterations}).")
-        return packed_objects_coords
-
-    @functools.lru_cache(maxsize=32)
-    def _cached_nasa_call(self, lon, lat):
+            return no_panels
+
+        # Identical panels fill every shelf alike, so the layout is a regular grid
+        # The epsilon keeps exact multiples (200 m / 1.6 m) from flooring one panel short
+        cols = int(math.floor(land_width_m / obj_width_m + 1e-9))
+        rows = int(math.floor(land_height_m / obj_height_m + 1e-9))
+        total = cols * rows
+        if num_objects_to_pack is not None:
+            total = min(total, num_objects_to_pack)
+        if total > MAX_PANELS:
+            logger.warning("Packing capped at %d of %d panels", MAX_PANELS, total)
+        total = min(total, MAX_PANELS)
+        if total == 0:
+            return no_panels
+
+        # Only the shelves actually used are generated, the last one possibly partial
+        full_rows, remainder = divmod(total, cols)
+        used_rows = full_rows + (1 if remainder else 0)
+        grid_x, grid_y = np.meshgrid(np.arange(min(cols, total)) * obj_width_m,
+                                     np.arange(used_rows) * obj_height_m, indexing='xy')
+        return grid_x.ravel()[:total], grid_y.ravel()[:total]
+
+    def _fetch_nasa(self, lon, lat):
         base_url = "https://power.larc.nasa.gov/api/temporal/climatology/point"
         params = {
             "parameters": "ALLSKY_SFC_SW_DWN",
@@ -847,51 +1157,114 @@ class GeoTIFFSlopeViewer:
             "latitude":  f"{lat:.4f}",
             "format": "JSON"
         }
-        url = f"{base_url}?{urllib.parse.urlencode(params)}"
-        with urllib.request.urlopen(url, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
+        resp = self._http.get(base_url, params=params, timeout=15)
+        resp.raise_for_status()
+        data = json_loads(resp.content)
         value = data.get("properties", {}).get("parameter", {}).get("ALLSKY_SFC_SW_DWN", {}).get("ANN")
         if value is None or value < 0:
             raise ValueError("Bad NASA response")
         return value
 
-    def fetch_nasa_power_data(self, lon, lat):
+    @functools.lru_cache(maxsize=512)
+    def _cached_nasa_call(self, lon, lat):
+        """Annual irradiance for a location, served from disk when fetched before."""
+        cache_path = os.path.join(POWER_CACHE_DIR, f"power_{lat:.2f}_{lon:.2f}.json")
+        try:
+            with open(cache_path) as f:
+                entry = json.load(f)
+            if time.time() - entry["fetched"] < POWER_CACHE_TTL_S:
+                return entry["ANN"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        value = self._fetch_nasa(lon, lat)
+        tmp_path = None
+        try:
+            os.makedirs(POWER_CACHE_DIR, exist_ok=True)
+            # A unique temp file per write: worker threads may miss on the same location at once
+            with tempfile.NamedTemporaryFile('w', dir=POWER_CACHE_DIR, suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                json.dump({"ANN": value, "fetched": time.time()}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            # An unwritable cache only costs a refetch next session
+            logger.warning("Could not write NASA POWER cache %s: %s", cache_path, e)
+            if tmp_path is not None:
+                with suppress(OSError):
+                    os.remove(tmp_path)
+        return value
+
+    def fetch_nasa_power_data(self, lon, lat, callback):
+        """Fetches irradiance off the Tk thread; callback gets the value (or None) on the Tk thread."""
+        self._set_label(self.lbl_annual_energy, "Fetching solar data…")
+        # POWER's grid is far coarser than 0.01°, so nearby clicks share an entry
+        future = self._pool.submit(self._cached_nasa_call, round(lon, 2), round(lat, 2))
+        future.add_done_callback(lambda f: self.master.after(0, self._on_nasa_done, f, callback))
+
+    def _on_nasa_done(self, future, callback):
         try:
-            self.lbl_annual_energy.config(text="Fetching solar data…")
-            self.master.update_idletasks()
-            return self._cached_nasa_call(round(lon, 4), round(lat, 4))
+            value = future.result()
         except Exception as e:
             messagebox.showerror("NASA POWER Error", str(e))
-            return None
+            value = None
+        callback(value)
 
     def calculate_and_display_solar_energy(self, num_panels, panel_area_m2):
         if self.marker_lon_lat is None:
-            self.lbl_annual_energy.config(text="Est. Annual Energy: Set marker first.")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: Set marker first.")
             return
         if num_panels == 0:
-            self.lbl_annual_energy.config(text="Est. Annual Energy: 0 kWh (No panels)")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: 0 kWh (No panels)")
             return
 
         energy_inputs = self._validate_energy_inputs()
         if not energy_inputs:
-            self.lbl_annual_energy.config(text="Est. Annual Energy: Invalid inputs.")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: Invalid inputs.")
             return
         panel_efficiency, perf_ratio = energy_inputs
 
+        # Results for a marker or run that has since been replaced are dropped
+        self._energy_request_id += 1
+        request_id = self._energy_request_id
+
+        def on_irradiance(avg_daily_irradiance_kwh_m2_day):
+            if request_id == self._energy_request_id:
+                self._display_solar_energy(avg_daily_irradiance_kwh_m2_day, num_panels, panel_area_m2,
+                                           panel_efficiency, perf_ratio)
+
         lon, lat = self.marker_lon_lat
-        avg_daily_irradiance_kwh_m2_day = self.fetch_nasa_power_data(lon, lat)
+        self.fetch_nasa_power_data(lon, lat, on_irradiance)
 
+    def _display_solar_energy(self, avg_daily_irradiance_kwh_m2_day, num_panels, panel_area_m2,
+                              panel_efficiency, perf_ratio):
         if avg_daily_irradiance_kwh_m2_day is None:
-            self.lbl_annual_energy.config(text="Est. Annual Energy: Solar data unavailable.")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: Solar data unavailable.")
             return
 
         energy_daily_per_panel_kwh = avg_daily_irradiance_kwh_m2_day * panel_area_m2 * panel_efficiency * perf_ratio
         total_energy_annual_kwh = energy_daily_per_panel_kwh * num_panels * 365
 
-        self.lbl_annual_energy.config(text=f"Est. Annual Energy: {total_energy_annual_kwh:,.2f} kWh")
+        self._set_label(self.lbl_annual_energy, f"Est. Annual Energy: {total_energy_annual_kwh:,.2f} kWh")
+        self._record_export_row(num_panels, total_energy_annual_kwh)
+
+    def _record_export_row(self, num_panels, annual_kwh):
+        """Formats the finished analysis for the current marker once, for a later CSV export."""
+        # Slope & aspect sampled when the marker was set
+        slope, aspect, direction = self._marker_raster_sample
+        if np.isnan(aspect):
+            direction = "NoData"
+        lon, lat = self.marker_lon_lat
+        self._export_rows.append((
+            os.path.basename(self.filepath), lon, lat,
+            f"{slope:.2f}" if not np.isnan(slope) else "NoData",
+            direction,
+            num_panels,
+            round(annual_kwh, 2),
+            datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        ))
 
     def export_results_csv(self):
-        if not self.marker_lon_lat:
+        if not self._export_rows:
             messagebox.showwarning("Export", "Run an analysis first.")
             return
 
@@ -900,27 +1273,12 @@ class GeoTIFFSlopeViewer:
         if not file:
             return
 
-        # Retrieve slope & aspect from marker pixel
-        col, row = self.marker_pixel_coords
-        slope = self.slope_degrees[row, col]
-        aspect = self.aspect_degrees[row, col]
-        direction = self._get_aspect_direction(aspect) if not np.isnan(aspect) else "NoData"
-
-        with open(file, 'w', newline='') as f:
+        with open(file, 'w', newline='', buffering=1 << 16) as f:
             w = csv.writer(f)
-            w.writerow(["Lon", "Lat", "Slope_deg", "Aspect_direction",
+            w.writerow(["Source_file", "Lon", "Lat", "Slope_deg", "Aspect_direction",
                         "Panels", "Annual_kWh", "Timestamp"])
-            lon, lat = self.marker_lon_lat
-            txt = self.lbl_annual_energy.cget("text")
-            energy = float(txt.split()[3].replace(',', '')) if "kWh" in txt else 0
-            panels = self.lbl_panels_packed.cget("text").split()[1]
-            w.writerow([lon, lat,
-                        f"{slope:.2f}" if not np.isnan(slope) else "NoData",
-                        direction,
-                        panels,
-                        energy,
-                        datetime.datetime.utcnow().isoformat(timespec='seconds')])
-        messagebox.showinfo("Export", f"Saved to {file}")
+            w.writerows(self._export_rows)
+        messagebox.showinfo("Export", f"Saved {len(self._export_rows)} analyses to {file}")
 
     def run_packing_and_energy_simulation(self):
         if not self.marker_pixel_coords:
@@ -930,20 +1288,24 @@ class GeoTIFFSlopeViewer:
             messagebox.showerror("Error", "Load a GeoTIFF first.")
             return
 
+        # A new run supersedes any irradiance fetch still in flight, whichever way it ends
+        self._energy_request_id += 1
         validated_inputs = self._validate_packing_inputs()
         if not validated_inputs:
-            self.lbl_panels_packed.config(text="Packed: Invalid inputs")
-            self.lbl_annual_energy.config(text="Est. Annual Energy: N/A")
+            self._set_label(self.lbl_panels_packed, "Packed: Invalid inputs")
+            self._set_label(self.lbl_annual_energy, "Est. Annual Energy: N/A")
             return
         land_width_m, land_height_m, panel_width_m, panel_height_m, num_to_pack = validated_inputs
 
-#        self.clear_packing_visualization()
+        # Clearing the old panels and drawing the new ones costs a single redraw
+        with self._batch_draw():
+            self.clear_packing_visualization()
 
-        marker_col_px, marker_row_px = self.marker_pixel_coords
+            marker_col_px, marker_row_px = self.marker_pixel_coords
 #        land_width_px = land_width_m / self.pixel_width_m
 #        land_height_px = land_height_m / self.pixel_height_m
 
-        # Clamp land rectangle to image bounds
+            # Clamp land rectangle to image bounds
 #        cols, rows = self.slope_degrees.shape[1], self.slope_degrees.shape[0]
 #        marker_col_px = max(0, min(marker_col_px, cols - land_width_px))
 #        marker_row_px = max(0, min(marker_row_px, rows - land_height_px))
@@ -952,33 +1314,44 @@ class GeoTIFFSlopeViewer:
 #                                              edgecolor='blue', facecolor='blue', alpha=0.2, linewidth=1.5)
 #        self.ax.add_patch(self.land_area_rect_patch)
 
-        packed_objects_meter_coords = self.next_fit_shelf_packing(land_width_m, land_height_m, panel_width_m, panel_height_m, num_to_pack)
-        num_panels_packed = len(packed_objects_meter_coords)
+            xs, ys = self.next_fit_shelf_packing(land_width_m, land_height_m, panel_width_m, panel_height_m, num_to_pack)
+            num_panels_packed = len(xs)
 
-        if num_panels_packed == 0:
-            status_msg = "No panels could be packed."
-            if num_to_pack is not None and num_to_pack > 0:
-                status_msg = f"Could not pack the specified {num_to_pack} panels. Packed 0."
-            self.lbl_panels_packed.config(text=status_msg)
-            self.lbl_annual_energy.config(text="Est. Annual Energy: 0 kWh")
-            self.canvas.draw_idle()
-            return
+            if num_panels_packed == 0:
+                status_msg = "No panels could be packed."
+                if num_to_pack is not None and num_to_pack > 0:
+                    status_msg = f"Could not pack the specified {num_to_pack} panels. Packed 0."
+                self._set_label(self.lbl_panels_packed, status_msg)
+                self._set_label(self.lbl_annual_energy, "Est. Annual Energy: 0 kWh")
+                self._request_redraw()
+                return
 
-#        for obj_m_coords in packed_objects_meter_coords:
-            obj_col_px = marker_col_px + (obj_m_coords['x'] / self.pixel_width_m)
-            obj_row_px = marker_row_px + (obj_m_coords['y'] / self.pixel_height_m)
+            # All panels go into one collection: a single artist to draw and blit
             obj_width_px = panel_width_m / self.pixel_width_m
             obj_height_px = panel_height_m / self.pixel_height_m
-            obj_patch = Rectangle((obj_col_px, obj_row_px), obj_width_px, obj_height_px,
-                                  edgecolor='red', facecolor='red', alpha=0.5, linewidth=1)
-            self.ax.add_patch(obj_patch)
-            self.packed_object_patches.append(obj_patch)
-
-        status_msg = f"Packed {num_panels_packed} panels."
-        if num_to_pack is not None and num_panels_packed < num_to_pack:
-            status_msg += f" (Requested: {num_to_pack})"
-        self.lbl_panels_packed.config(text=status_msg)
-        self.canvas.draw_idle()
+            verts = np.empty((num_panels_packed, 4, 2))
+            # Shelf offsets in meters -> pixel positions, batched through one affine
+            meters_to_px = (Affine.translation(marker_col_px, marker_row_px)
+                            * Affine.scale(1 / self.pixel_width_m, 1 / self.pixel_height_m))
+            cols_px, rows_px = meters_to_px * (xs, ys)
+            verts[:, :, 0] = cols_px[:, np.newaxis] + [0, obj_width_px, obj_width_px, 0]
+            verts[:, :, 1] = rows_px[:, np.newaxis] + [0, 0, obj_height_px, obj_height_px]
+            # The collection outlives each run; later runs only swap its vertices
+            if self._panel_collection is None:
+                self._panel_collection = PolyCollection(verts, edgecolors='red', facecolors='red', alpha=0.5,
+                                                        linewidths=1, animated=self._use_blit)
+                self.ax.add_collection(self._panel_collection, autolim=False)
+            else:
+                self._panel_collection.set_verts(verts)
+                self._panel_collection.set_visible(True)
+
+            status_msg = f"Packed {num_panels_packed} panels."
+            if num_to_pack is not None and num_panels_packed < num_to_pack:
+                status_msg += f" (Requested: {num_to_pack})"
+            if num_panels_packed == MAX_PANELS:
+                status_msg += f" (limit of {MAX_PANELS:,} reached)"
+            self._set_label(self.lbl_panels_packed, status_msg)
+            self._request_redraw()
 
         panel_area_m2 = panel_width_m * panel_height_m
         self.calculate_and_display_solar_energy(num_panels_packed, panel_area_m2)